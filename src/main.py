@@ -18,12 +18,17 @@ from .routes.numbers_route import router as numbers_router
 # Importing the auth router
 from .routes.auth_route import router as auth_router
 
+# Importing the profiling router
+from .routes.profiling_route import router as profiling_router
+
 # Importing CORS middleware
 from fastapi.middleware.cors import CORSMiddleware
 
 # Importing custom exception handlers and error middleware
 from .middleware.handlers import register_exception_handlers
 from .middleware.error_middleware import error_middleware
+from .middleware.profiling_middleware import profiling_middleware
+from .services.profiling_service import PROFILING_ENABLED
 
 # Shutdown: flush TinyDB cache
 #@app.on_event("shutdown") <- Deprecated, replaced with lifespan events in FastAPI 0.95.0+
@@ -57,6 +62,11 @@ app.add_middleware(
 
 # Registering middleware and exception handlers
 register_exception_handlers(app)
+# Profiling is opt-in, registered before the error middleware so errors are still handled outside it
+if PROFILING_ENABLED:
+    app.middleware("http")(profiling_middleware)
+    # Registering the profiling router (administrator only)
+    app.include_router(profiling_router, tags=["profiling"])
 app.middleware("http")(error_middleware)
 
 # Registering the numbers router
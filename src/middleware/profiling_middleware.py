@@ -0,0 +1,83 @@
+from fastapi import Request, HTTPException
+from starlette.concurrency import run_in_threadpool
+from ..services.auth_service import decode_token, is_token_blacklisted
+from ..services.profiling_service import PROFILING_HEADER, PROFILING_ROLE, PROFILING_ROUTE_PREFIX, should_sample, start_profiler, stop_profiler, save_profile
+import time
+
+# In-flight request tracking, only touched from the event loop so no lock is needed
+_in_flight = 0
+_started_total = 0
+
+def _is_admin_request(request: Request) -> bool:
+    """Check if the request carries a valid, non-revoked administrator token."""
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token or is_token_blacklisted(token):
+        return False
+    try:
+        return decode_token(token).get("role") == PROFILING_ROLE
+    except HTTPException:
+        return False
+
+async def profiling_middleware(request: Request, call_next):
+    """Middleware to capture a cProfile of selected requests (opt-in via PROFILING_ENABLED).
+
+    A request is profiled when an administrator sends the X-Profile header, or when it
+    falls on the configured 1-in-N sample (the profiling endpoints themselves are never
+    sampled). The profiler records everything that runs while the request is in flight:
+    other requests' coroutines on the event loop and, on Python 3.12+, their threadpool
+    work too. The number of overlapping requests is saved as concurrent_requests.
+    """
+    global _in_flight, _started_total
+    _in_flight += 1
+    _started_total += 1
+    try:
+        return await _profile_request(request, call_next)
+    finally:
+        _in_flight -= 1
+
+async def _profile_request(request: Request, call_next):
+    """Profile the request if it was selected, otherwise just pass it through."""
+    profile_requested = request.headers.get(PROFILING_HEADER, "").lower() in ("1", "true", "yes")
+    if profile_requested and _is_admin_request(request):
+        trigger = "header"
+    elif not request.url.path.startswith(PROFILING_ROUTE_PREFIX) and should_sample():
+        trigger = "sample"
+    else:
+        return await call_next(request)
+
+    profiler = start_profiler()
+    if profiler is None:
+        # Another request is being profiled, skip this one
+        return await call_next(request)
+
+    # Requests already running plus the ones started before this one finishes
+    already_running = _in_flight - 1
+    started_before = _started_total
+    start = time.perf_counter()
+    status_code = 500
+    profile_id = None
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+    finally:
+        stop_profiler(profiler)
+        duration_ms = (time.perf_counter() - start) * 1000
+        concurrent_requests = already_running + (_started_total - started_before)
+        route = getattr(request.scope.get("route"), "path", None)
+        # Sampled requests that matched no route are client-controlled 404 noise, drop them
+        if route is not None or trigger == "header":
+            # Disk I/O runs in the threadpool to keep it off the event loop
+            profile_id = await run_in_threadpool(save_profile, profiler, {
+                "method": request.method,
+                "route": route,
+                "path": request.url.path,
+                "status": status_code,
+                "duration_ms": round(duration_ms, 3),
+                "trigger": trigger,
+                "concurrent_requests": concurrent_requests,
+            })
+
+    # Only reveal the profile id to the administrator who asked for it
+    if profile_id and trigger == "header":
+        response.headers["X-Profile-Id"] = profile_id
+    return response
@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends, Query
+from typing import Literal
+from ..services.auth_service import require_role
+from ..services.profiling_service import PROFILING_MAX_FILES, PROFILING_ROLE, PROFILING_ROUTE_PREFIX, list_recent_profiles, aggregate_hot_functions
+
+router = APIRouter(prefix=PROFILING_ROUTE_PREFIX)
+
+# Handlers are sync so the file reads and pstats merges run in the threadpool, not on the event loop
+@router.get("")
+def get_profiles(limit: int = Query(min(20, PROFILING_MAX_FILES), ge=1, le=PROFILING_MAX_FILES), user: dict = Depends(require_role(PROFILING_ROLE))):
+    """List the most recent request profiles."""
+    return {"profiles": list_recent_profiles(limit)}
+
+@router.get("/hotspots")
+def get_hotspots(
+    limit: int = Query(min(20, PROFILING_MAX_FILES), ge=1, le=PROFILING_MAX_FILES),
+    top: int = Query(25, ge=1, le=500),
+    sort_by: Literal["tottime", "cumtime", "calls"] = "tottime",
+    isolated_only: bool = False,
+    user: dict = Depends(require_role(PROFILING_ROLE)),
+):
+    """Aggregate the hottest functions across the most recent profiles."""
+    return aggregate_hot_functions(limit=limit, top=top, sort_by=sort_by, isolated_only=isolated_only)
@@ -0,0 +1,145 @@
+from ..database.db import DATA_DIR
+from datetime import datetime, timezone
+from threading import Lock
+from typing import List
+import cProfile
+import json
+import os
+import pstats
+import re
+import uuid
+
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() in ("1", "true", "yes")
+PROFILING_SAMPLE_RATE = max(0, int(os.getenv("PROFILING_SAMPLE_RATE", 0)))  # 1 in N requests, 0 disables sampling
+PROFILING_MAX_FILES = max(1, int(os.getenv("PROFILING_MAX_FILES", 50)))
+PROFILING_ROLE = "administrator"
+PROFILING_HEADER = "X-Profile"
+PROFILING_ROUTE_PREFIX = "/admin/profiles"
+PROFILES_DIR = DATA_DIR / "profiles"
+
+# Only one cProfile can be active at a time (Python 3.12+ refuses a second one)
+_profiler_lock = Lock()
+_counter_lock = Lock()
+_request_counter = 0
+
+# >>>>> CAPTURE <<<<<
+
+def should_sample() -> bool:
+    """Return True once every PROFILING_SAMPLE_RATE requests."""
+    global _request_counter
+    if PROFILING_SAMPLE_RATE <= 0:
+        return False
+    with _counter_lock:
+        _request_counter += 1
+        return _request_counter % PROFILING_SAMPLE_RATE == 0
+
+def start_profiler() -> cProfile.Profile | None:
+    """Start a profiler, or return None if another request is already being profiled."""
+    if not _profiler_lock.acquire(blocking=False):
+        return None
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except Exception:
+        _profiler_lock.release()
+        return None
+    return profiler
+
+def stop_profiler(profiler: cProfile.Profile) -> None:
+    """Stop a profiler started with start_profiler and release the slot."""
+    try:
+        profiler.disable()
+    finally:
+        _profiler_lock.release()
+
+def save_profile(profiler: cProfile.Profile, metadata: dict) -> str | None:
+    """Dump profile stats and their metadata to the profiles directory."""
+    try:
+        PROFILES_DIR.mkdir(parents=True, exist_ok=True)
+        created_at = datetime.now(timezone.utc)
+        # Only matched route templates go into the file name, raw paths stay in the sidecar
+        route = metadata.get("route")
+        if route is None:
+            route_slug = "unmatched"
+        else:
+            route_slug = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_")[:60] or "root"
+        profile_id = f"{created_at:%Y%m%dT%H%M%S%f}_{metadata.get('method', 'GET')}_{route_slug}_{uuid.uuid4().hex[:6]}"
+
+        profiler.dump_stats(PROFILES_DIR / f"{profile_id}.prof")
+        record = {
+            "id": profile_id,
+            "created_at": created_at.strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+            **metadata,
+        }
+        (PROFILES_DIR / f"{profile_id}.json").write_text(json.dumps(record, indent=4))
+
+        _prune_profiles()
+        return profile_id
+    except Exception as e:
+        print(f"Failed to save profile: {e}")
+        return None
+
+def _prune_profiles() -> None:
+    """Remove the oldest profiles beyond PROFILING_MAX_FILES."""
+    metadata_files = sorted(PROFILES_DIR.glob("*.json"), reverse=True)
+    for meta_path in metadata_files[PROFILING_MAX_FILES:]:
+        meta_path.unlink(missing_ok=True)
+        meta_path.with_suffix(".prof").unlink(missing_ok=True)
+
+# >>>>> INSPECTION <<<<<
+
+def list_recent_profiles(limit: int = 20) -> List[dict]:
+    """List metadata of the most recent profiles, newest first."""
+    if not PROFILES_DIR.exists():
+        return []
+
+    results = []
+    # Profile ids start with a UTC timestamp, so name order is chronological
+    for meta_path in sorted(PROFILES_DIR.glob("*.json"), reverse=True)[:limit]:
+        try:
+            results.append(json.loads(meta_path.read_text()))
+        except (OSError, ValueError) as e:
+            print(f"Failed to read profile metadata {meta_path.name}: {e}")
+    return results
+
+def aggregate_hot_functions(limit: int = 20, top: int = 25, sort_by: str = "tottime", isolated_only: bool = False) -> dict:
+    """Aggregate stats of the most recent profiles and return the hottest functions.
+
+    Profiles with concurrent_requests > 0 also contain other requests' work, isolated_only skips them.
+    """
+    profiles = list_recent_profiles(limit)
+    if isolated_only:
+        profiles = [p for p in profiles if p.get("concurrent_requests") == 0]
+    stats = None
+    used = 0
+    concurrent = 0
+    for profile in profiles:
+        try:
+            prof_path = PROFILES_DIR / f"{profile['id']}.prof"
+            if stats is None:
+                stats = pstats.Stats(str(prof_path))
+            else:
+                stats.add(str(prof_path))
+            used += 1
+            if profile.get("concurrent_requests"):
+                concurrent += 1
+        except (OSError, EOFError, KeyError, TypeError, ValueError) as e:
+            print(f"Failed to load profile {profile.get('id')}: {e}")
+
+    if stats is None:
+        return {"profiles": 0, "concurrent_profiles": 0, "sort_by": sort_by, "functions": []}
+
+    # pstats entries: (file, line, name) -> (primitive calls, total calls, tottime, cumtime, callers)
+    rows = [
+        {
+            "function": f"{file}:{line}({name})",
+            "calls": calls,
+            "primitive_calls": primitive_calls,
+            "tottime": round(tottime, 6),
+            "cumtime": round(cumtime, 6),
+        }
+        for (file, line, name), (primitive_calls, calls, tottime, cumtime, _) in stats.stats.items()
+    ]
+    rows.sort(key=lambda r: r[sort_by], reverse=True)
+
+    return {"profiles": used, "concurrent_profiles": concurrent, "sort_by": sort_by, "functions": rows[:top]}